@@ -4,12 +4,14 @@ from datetime import datetime, date
 from typing import Callable
 
 import numpy as np
-from numpy import zeros, newaxis, sum as npsum
+from numpy import newaxis, sum as npsum
 
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 from matplotlib import colormaps
 from matplotlib.axes import Axes
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba_array
 from matplotlib.figure import Figure
 from matplotlib.patches import Patch
 from matplotlib.ticker import FuncFormatter, LinearLocator
@@ -21,9 +23,31 @@ _SECS_IN_HOUR = _MINS_IN_HOUR * _SECS_IN_MIN
 _HOURS_IN_DAY = 24
 _SECS_IN_DAY = _SECS_IN_HOUR * _HOURS_IN_DAY
 _DAYS_IN_WEEK = 7
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday
+_MAX_HB_TYPES = np.iinfo(np.int16).max + 1  # Heartbeat type IDs are stored as int16
+_MAX_LEGEND_TYPES = np.iinfo(np.uint8).max + 1  # Color IDs are stored as uint8
 
 _COLOR_TYPE = tuple[float, float, float]
 
+# Time tick labels for each minute of a day and of a week
+_MINUTE_LABELS = tuple(
+    '{:02d}:{:02d}'.format(hour, minute) for hour in range(_HOURS_IN_DAY) for minute in range(_MINS_IN_HOUR)
+)
+_WEEKDAY_MINUTE_LABELS = tuple(
+    '{} {}'.format(day_abbr[weekday], minute_label) for weekday in range(_DAYS_IN_WEEK) for minute_label in _MINUTE_LABELS
+)
+
+
+def _segment_bounds(breaks: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    ends = np.flatnonzero(breaks)
+    return np.concatenate(([0], ends + 1)), np.append(ends, len(breaks))
+
+
+def _epoch_date_num() -> float:
+    # Not a constant because matplotlib's epoch can be changed
+    return mdates.date2num(np.datetime64(0, "D"))
+
 
 def show():
     plt.show()
@@ -36,128 +60,368 @@ def savefig(*args, **kwargs):
 class HeartbeatData:
     DEFAULT_LEGEND_LENGTH = 10
     DEFAULT_TIMEOUT = 15 * _SECS_IN_MIN
+    DEFAULT_REFRESH_INTERVAL = 150  # Minimum milliseconds between refreshes while dragging the timeout slider
 
     fig: Figure = None
     ax: Axes = None
 
-    hb_type_counter = Counter()
-    hb_types = []
-    dates = []
-    secs_since_midnights = []
+    hb_type_counter: Counter = None
 
     hb_type_color_map: dict[str, _COLOR_TYPE] = None  # Set by legend
-    colors: list[_COLOR_TYPE] = None  # Set by legend
-    duration_dates: list[date] = None  # Set by calc_durations
-    duration_types: list[str] = None  # Set by calc_durations
-    duration_lengths: list[int] = None  # Set by calc_durations
-    duration_starts: list[int] = None  # Set by calc_durations
-    duration_counts = None  # Set by calc_duration_counts
+    palette: np.ndarray = None  # RGBA, set by legend
+    duration_dates: np.ndarray = None  # Set by calc_durations
+    duration_types: np.ndarray = None  # Set by calc_durations
+    duration_lengths: np.ndarray = None  # Set by calc_durations
+    duration_starts: np.ndarray = None  # Set by calc_durations
+    duration_color_ids: np.ndarray = None  # Set by calc_durations, if legend has been called
+    duration_counts: np.ndarray = None  # Set by calc_duration_counts
     timeout_slider: Slider = None  # Set by show_timeout_slider
 
     def __init__(self):
         self.fig, self.ax = plt.subplots()
+        self.hb_type_counter = Counter()
+        self._hb_buffer = []  # Heartbeats added by add_hb which haven't been moved into the arrays yet
+        self._hb_type_vocab: dict[str, int] = {}  # Maps each heartbeat type to its ID, in order of ID
+        self._hb_type_ids = np.empty(0, np.int16)
+        self._day_ordinals = np.empty(0, np.int32)  # Days since the Unix epoch
+        self._weekdays = np.empty(0, np.int8)
+        self._secs_since_midnights = np.empty(0, np.int32)
+        # Parts of the segmentation which don't depend on the timeout, cached by _segment
+        self._gaps = None
+        self._date_changes = None
+        self._type_changes = None
+        self._date_nums = None  # Cached by date_nums
+        # Set by _build_type_mapping, and kept until it's called with different arguments or heartbeats are added
+        self._type_mapping_key = None
+        self._legend_types: list[str] = None
+        self._color_ids = None  # Cleared when heartbeats are added, and then rebuilt from _legend_types by color_ids
+        # Set by calc_durations, for duration_at. Keys are seconds since the Unix epoch that each duration starts
+        self._duration_order = None
+        self._duration_keys = None
+        self._duration_ends = None
+        self._duration_max_ends = None
+
+    @classmethod
+    def from_records(cls, hb_types, timestamps):
+        hb_data = cls()
+        hb_data.add_hbs(hb_types, timestamps)
+        return hb_data
+
+    @classmethod
+    def from_csv(cls, path, type_column="type", time_column="ts", time_format=None, **read_csv_kwargs):
+        import pandas as pd  # Optional dependency, only needed for reading CSVs
+
+        read_csv_kwargs["usecols"] = list(dict.fromkeys((*read_csv_kwargs.get("usecols", ()), type_column, time_column)))
+        read_csv_kwargs["dtype"] = {**read_csv_kwargs.get("dtype", {}), type_column: "category", time_column: str}
+        df = pd.read_csv(path, **read_csv_kwargs)
+        # Use each heartbeat's local time, like add_hb does. The UTC offsets are stripped
+        # rather than parsed, since they can vary within a file (e.g. across daylight saving time)
+        timestamps = pd.to_datetime(
+            df[time_column].str.replace(r"\s*(?:Z|[+-]\d{2}:?\d{2})$", "", regex=True), format=time_format, errors="coerce"
+        )
+        if timestamps.isna().any():
+            bad_rows = df.index[timestamps.isna()].tolist()
+            raise ValueError(f"Missing or unparseable {time_column} in rows {bad_rows[:10]}{'...' if len(bad_rows) > 10 else ''}")
+        # Missing types have the code -1, so they're moved to an extra "" category which becomes "Other"
+        hb_types = df[type_column].cat
+        unique_types = list(hb_types.categories) + [""]
+        codes = hb_types.codes.to_numpy(np.intp)
+        codes[codes < 0] = len(unique_types) - 1
+        hb_data = cls()
+        hb_data._add_encoded_hbs(
+            unique_types, codes, np.bincount(codes, minlength=len(unique_types)), timestamps.to_numpy("datetime64[s]")
+        )
+        return hb_data
+
+    @property
+    def hb_type_ids(self) -> np.ndarray:
+        self._flush_hb_buffer()
+        return self._hb_type_ids
+
+    @property
+    def hb_types(self) -> np.ndarray:
+        type_ids, type_names = self._merged_types()
+        return np.array(type_names, object)[type_ids]
+
+    @property
+    def day_ordinals(self) -> np.ndarray:
+        self._flush_hb_buffer()
+        return self._day_ordinals
+
+    @property
+    def weekdays(self) -> np.ndarray:
+        self._flush_hb_buffer()
+        return self._weekdays
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self.day_ordinals.astype("datetime64[D]")
+
+    @property
+    def date_nums(self) -> np.ndarray:
+        self._flush_hb_buffer()
+        if self._date_nums is None:
+            self._date_nums = self._day_ordinals + _epoch_date_num()
+        return self._date_nums
+
+    @property
+    def color_ids(self) -> np.ndarray:
+        # Index into palette for each heartbeat, available once legend has been called
+        self._flush_hb_buffer()
+        if self._color_ids is None and self._legend_types is not None:
+            self._remap_types()
+        return self._color_ids
+
+    @property
+    def colors(self) -> np.ndarray:
+        # Only expanded on request, since plots draw straight from color_ids and palette
+        return None if self.color_ids is None else self.palette[self.color_ids]
+
+    @property
+    def secs_since_midnights(self) -> np.ndarray:
+        self._flush_hb_buffer()
+        return self._secs_since_midnights
 
     def add_hb(self, hb_type: str, timestamp: datetime):
-        if hb_type == "":
-            hb_type = "Other"
-        else:
+        vocab_type = hb_type or "Other"
+        if vocab_type not in self._hb_type_vocab:
+            self._check_new_hb_types(1)  # Checked before anything is changed
+        hb_type_id = self._hb_type_vocab.setdefault(vocab_type, len(self._hb_type_vocab))
+        if hb_type != "":
             self.hb_type_counter[hb_type] += 1
-        self.hb_types.append(hb_type)
-        self.dates.append(timestamp.date())
-        self.secs_since_midnights.append(
-            timestamp.hour * _SECS_IN_HOUR + timestamp.minute * _SECS_IN_MIN + timestamp.second)
+        self._hb_buffer.append((
+            hb_type_id,
+            timestamp.date().toordinal() - _EPOCH_ORDINAL,
+            timestamp.hour * _SECS_IN_HOUR + timestamp.minute * _SECS_IN_MIN + timestamp.second
+        ))
+
+    def add_hbs(self, hb_types, timestamps):
+        # Timestamps are naive local times, so timezone-aware datetimes should be converted before being passed in
+        unique_types, unique_type_indices, type_counts = np.unique(
+            np.asarray(hb_types, object), return_inverse=True, return_counts=True
+        )
+        self._add_encoded_hbs(unique_types, unique_type_indices.reshape(-1), type_counts, timestamps)
+
+    def _add_encoded_hbs(self, unique_types, unique_type_indices: np.ndarray, type_counts: np.ndarray, timestamps):
+        timestamps = np.asarray(timestamps, "datetime64[s]").view("i8")
+        if len(unique_type_indices) != len(timestamps):
+            raise ValueError(f"Got {len(unique_type_indices)} heartbeat types but {len(timestamps)} timestamps")
+        self._check_new_hb_types(len({hb_type or "Other" for hb_type in unique_types} - self._hb_type_vocab.keys()))
+        self.hb_type_counter.update({
+            hb_type: count for hb_type, count in zip(unique_types, type_counts.tolist()) if hb_type != "" and count
+        })
+        unique_type_ids = np.array([
+            self._hb_type_vocab.setdefault(hb_type or "Other", len(self._hb_type_vocab)) for hb_type in unique_types
+        ], np.int16)
+        self._flush_hb_buffer()
+        self._extend(
+            unique_type_ids[unique_type_indices],
+            (timestamps // _SECS_IN_DAY).astype(np.int32),
+            (timestamps % _SECS_IN_DAY).astype(np.int32)
+        )
+
+    def _check_new_hb_types(self, new_type_count):
+        if len(self._hb_type_vocab) + new_type_count > _MAX_HB_TYPES:
+            raise ValueError(f"Can't have more than {_MAX_HB_TYPES} distinct heartbeat types")
+
+    def _merged_types(self) -> tuple[np.ndarray, list[str]]:
+        # Once legend has been called, types which aren't in the legend are treated as its other_name
+        color_ids = self.color_ids
+        if color_ids is None:
+            return self._hb_type_ids, list(self._hb_type_vocab)
+        return color_ids, self._legend_types
+
+    def _flush_hb_buffer(self):
+        if self._hb_buffer:
+            hb_type_ids, day_ordinals, secs_since_midnights = zip(*self._hb_buffer)
+            self._hb_buffer = []
+            self._extend(
+                np.array(hb_type_ids, np.int16),
+                np.array(day_ordinals, np.int32),
+                np.array(secs_since_midnights, np.int32)
+            )
+
+    def _extend(self, hb_type_ids: np.ndarray, day_ordinals: np.ndarray, secs_since_midnights: np.ndarray):
+        self._hb_type_ids = np.concatenate((self._hb_type_ids, hb_type_ids))
+        self._day_ordinals = np.concatenate((self._day_ordinals, day_ordinals))
+        self._weekdays = np.concatenate((
+            self._weekdays, ((day_ordinals + _EPOCH_WEEKDAY) % _DAYS_IN_WEEK).astype(np.int8)
+        ))
+        self._secs_since_midnights = np.concatenate((self._secs_since_midnights, secs_since_midnights))
+        self._gaps = self._date_changes = self._type_changes = None
+        self._date_nums = None
+        self._type_mapping_key = None
+        self._color_ids = None
+
+    def _segment(self, timeout, split_types=True):
+        self._flush_hb_buffer()
+        if self._gaps is None:
+            self._gaps = np.diff(self._secs_since_midnights)
+            self._date_changes = self._day_ordinals[1:] != self._day_ordinals[:-1]
+        breaks = self._date_changes | (self._gaps > timeout)
+        if split_types:
+            if self._type_changes is None:
+                type_ids, _ = self._merged_types()
+                self._type_changes = type_ids[1:] != type_ids[:-1]
+            breaks |= self._type_changes
+        return _segment_bounds(breaks)
 
     def calc_durations(self, timeout=DEFAULT_TIMEOUT):
         print("Calculating durations")
-        self.duration_dates = []
-        self.duration_types = []
-        self.duration_lengths = []
-        self.duration_starts = []
-        heartbeats = zip(self.hb_types, self.dates, self.secs_since_midnights)
-        initial = next(heartbeats)
-        curr_hb_type = initial[0]
-        curr_date = initial[1]
-        curr_start = initial[2]
-        curr_end = curr_start
-        for hb_type, hb_date, secs_since_midnight in heartbeats:
-            if hb_type != curr_hb_type or hb_date != curr_date or secs_since_midnight > curr_end + timeout:
-                self.duration_dates.append(curr_date)
-                self.duration_types.append(curr_hb_type)
-                self.duration_lengths.append(curr_end - curr_start)
-                self.duration_starts.append(curr_start)
-                curr_hb_type = hb_type
-                curr_date = hb_date
-                curr_start = secs_since_midnight
-            curr_end = secs_since_midnight
+        starts, ends = self._segment(timeout)
+        secs_since_midnights = self.secs_since_midnights
+        day_ordinals = self.day_ordinals[starts]
+        self.duration_dates = day_ordinals.astype("datetime64[D]")
+        type_ids, type_names = self._merged_types()
+        self.duration_types = np.array(type_names, object)[type_ids[starts]]
+        self.duration_lengths = secs_since_midnights[ends] - secs_since_midnights[starts]
+        self.duration_starts = secs_since_midnights[starts]
+        color_ids = self.color_ids
+        self.duration_color_ids = None if color_ids is None else color_ids[starts]
+        # Local time can go backwards (e.g. daylight saving time ending), so durations
+        # aren't necessarily in order of their starts and have to be sorted for searching
+        keys = day_ordinals.astype(np.int64) * _SECS_IN_DAY + self.duration_starts
+        self._duration_order = np.argsort(keys, kind="stable")
+        self._duration_keys = keys[self._duration_order]
+        self._duration_ends = self._duration_keys + self.duration_lengths[self._duration_order]
+        # Latest end of any duration starting at or before each of the sorted keys
+        self._duration_max_ends = np.maximum.accumulate(self._duration_ends)
+
+    def duration_at(self, timestamp: datetime):
+        # Returns the index of the latest-starting duration which includes timestamp, if any
+        if self._duration_keys is None:
+            raise ValueError("Tried to find a duration before durations have been calculated")
+        key = (timestamp.date().toordinal() - _EPOCH_ORDINAL) * _SECS_IN_DAY + \
+            timestamp.hour * _SECS_IN_HOUR + timestamp.minute * _SECS_IN_MIN + timestamp.second
+        # Usually only the latest duration to start at or before timestamp needs checking,
+        # but earlier ones are also checked for as long as any of them could still overlap it
+        i = int(np.searchsorted(self._duration_keys, key, side="right")) - 1
+        while i >= 0 and self._duration_max_ends[i] >= key:
+            if self._duration_ends[i] >= key:
+                return int(self._duration_order[i])
+            i -= 1
+        return None
 
     def calc_duration_counts(self, timeout=DEFAULT_TIMEOUT):
         print("Calculating duration counts")
-        self.duration_counts = zeros((_DAYS_IN_WEEK, _SECS_IN_DAY - 1), np.int16)
-        heartbeats = zip(self.hb_types, self.dates, self.secs_since_midnights)
-        initial = next(heartbeats)
-        curr_date = initial[1]
-        curr_start = initial[2]
-        curr_end = curr_start
-        for hb_type, hb_date, secs_since_midnight in heartbeats:
-            if hb_date != curr_date or secs_since_midnight > curr_end + timeout:
-                self.duration_counts[curr_date.weekday(), curr_start:curr_end + 1] += 1
-                curr_date = hb_date
-                curr_start = secs_since_midnight
-            curr_end = secs_since_midnight
+        starts, ends = self._segment(timeout, split_types=False)
+        secs_since_midnights = self.secs_since_midnights
+        # Durations can end before they start if the local time went backwards (e.g. daylight
+        # saving time ending), and these would otherwise leave negative counts
+        is_forwards = secs_since_midnights[ends] >= secs_since_midnights[starts]
+        starts = starts[is_forwards]
+        ends = ends[is_forwards]
+        # Each duration adds 1 to a range of seconds in its weekday's row, so these are
+        # accumulated as +1/-1 changes at the edges of each range and then cumsummed
+        row_len = _SECS_IN_DAY + 1
+        row_offsets = self.weekdays[starts].astype(np.int32) * row_len
+        changes = np.bincount(row_offsets + secs_since_midnights[starts], minlength=_DAYS_IN_WEEK * row_len) - \
+            np.bincount(row_offsets + secs_since_midnights[ends] + 1, minlength=_DAYS_IN_WEEK * row_len)
+        if self.duration_counts is None:
+            # Reused across recalculations, so slider refreshes don't reallocate it
+            self.duration_counts = np.empty((_DAYS_IN_WEEK, _SECS_IN_DAY - 1), np.int32)
+        np.cumsum(
+            changes.reshape(_DAYS_IN_WEEK, row_len)[:, :_SECS_IN_DAY - 1], axis=1, dtype=np.int32,
+            out=self.duration_counts
+        )
 
     def legend(self, legend_length=DEFAULT_LEGEND_LENGTH, other_name="Other", color_map="tab20", **kwargs):
-        color_map = colormaps[color_map].colors
-        self.hb_type_color_map = {other_name: color_map[0]}
-        for i, (hb_type, _) in enumerate(self.hb_type_counter.most_common(legend_length - 1)):
-            self.hb_type_color_map[hb_type] = color_map[i + 1]
-        for i, hb_type in enumerate(self.hb_types):
-            if hb_type not in self.hb_type_color_map:
-                self.hb_types[i] = other_name
-        self.colors = [self.hb_type_color_map.get(hb_type, color_map[0]) for hb_type in self.hb_types]
+        color_map_length = len(colormaps[color_map].colors)
+        legend_type_count = len(self._pick_legend_types(legend_length, other_name))
+        if color_map_length < legend_type_count:
+            raise ValueError(f"Color map {color_map} only has {color_map_length} colors, but the legend needs {legend_type_count}")
+        if legend_type_count > _MAX_LEGEND_TYPES:
+            raise ValueError(f"The legend can't have more than {_MAX_LEGEND_TYPES} entries, but needs {legend_type_count}")
+        self._build_type_mapping(legend_length, other_name)
+        self._apply_palette(color_map)
         self.ax.legend(handles=[Patch(color=color, label=hb_type) for hb_type, color in self.hb_type_color_map.items()],
                        **kwargs)
 
+    def _pick_legend_types(self, legend_length, other_name) -> dict[str, int]:
+        legend_type_ids = {other_name: 0}
+        for hb_type, _ in self.hb_type_counter.most_common(legend_length - 1):
+            legend_type_ids.setdefault(hb_type, len(legend_type_ids))
+        return legend_type_ids
+
+    def _build_type_mapping(self, legend_length, other_name):
+        self._flush_hb_buffer()  # Flushed first, since adding heartbeats clears the cached mapping
+        if self._type_mapping_key == (legend_length, other_name):
+            return
+        self._legend_types = list(self._pick_legend_types(legend_length, other_name))
+        self._remap_types()
+        self._type_mapping_key = (legend_length, other_name)
+
+    def _remap_types(self):
+        # Types which aren't in the legend are merged into other_name, and each
+        # heartbeat's legend type ID is also its index into the palette
+        legend_type_ids = {hb_type: i for i, hb_type in enumerate(self._legend_types)}
+        kept_types = [hb_type for hb_type in legend_type_ids if hb_type in self._hb_type_vocab]
+        remap = np.zeros(len(self._hb_type_vocab), np.uint8)  # other_name is always ID 0
+        remap[np.array([self._hb_type_vocab[hb_type] for hb_type in kept_types], np.intp)] = \
+            np.array([legend_type_ids[hb_type] for hb_type in kept_types], np.uint8)
+        self._color_ids = remap[self._hb_type_ids]
+        self._type_changes = None
+
+    def _apply_palette(self, color_map):
+        self.hb_type_color_map = dict(zip(self._legend_types, colormaps[color_map].colors))
+        self.palette = to_rgba_array(list(self.hb_type_color_map.values())).astype(np.float32)
+
     def plot_dates(self):
         self.ax.yaxis.set_major_formatter(mdates.DateFormatter('%d/%m/%y'))
         self.ax.set_ylabel('Date')
         self.ax.invert_yaxis()
 
     def plot_times(self, weekdays=False):
-        def format_time(x):
-            if weekdays:
-                return '{} {:02d}:{:02d}'.format(
-                    day_abbr[x // _SECS_IN_DAY],
-                    (x // _SECS_IN_HOUR) % _HOURS_IN_DAY,
-                    (x % _SECS_IN_HOUR) // _MINS_IN_HOUR
-                )
-            return '{:02d}:{:02d}'.format(
-                x // _SECS_IN_HOUR,
-                (x % _SECS_IN_HOUR) // _MINS_IN_HOUR
-            )
-
+        labels = _WEEKDAY_MINUTE_LABELS if weekdays else _MINUTE_LABELS
         self.ax.margins(x=0)
         self.ax.xaxis.set_major_formatter(FuncFormatter(
-            lambda x, pos: format_time(int(x))
+            lambda x, pos: labels[int(x) // _SECS_IN_MIN % len(labels)]
         ))
         self.ax.xaxis.set_major_locator(LinearLocator(8))  # If over 5, should be 7n+1
         self.ax.set_xlabel('Time of day')
 
     def plot_scatter(self, **kwargs):
-        if self.colors is not None:
-            kwargs["color"] = self.colors
         self.plot_dates()
         self.plot_times()
-        self.ax.scatter(self.secs_since_midnights, mdates.date2num(self.dates), **kwargs)
+        secs_since_midnights = self.secs_since_midnights
+        date_nums = self.date_nums
+        color_ids = self.color_ids
+        if color_ids is None:
+            self.ax.scatter(secs_since_midnights, date_nums, **kwargs)
+            return
+        # One scatter per color is much faster to draw than a single scatter with a color per point
+        for color_id, color in enumerate(self.palette):
+            has_color = color_ids == color_id
+            kwargs["color"] = color
+            self.ax.scatter(secs_since_midnights[has_color], date_nums[has_color], **kwargs)
 
     def plot_durations(self, timeout_slider=True, plot_kwargs: dict[str, any] = None, slider_kwargs: dict[str, any] = None):
+        collection: PolyCollection = None
+
         def refresh():
+            nonlocal collection
             if self.duration_dates is None or self.duration_lengths is None or self.duration_starts is None:
                 raise ValueError("Tried to plot durations before durations have been calculated")
-            if self.colors is not None:
-                plot_kwargs.setdefault("color", [self.hb_type_color_map[duration_type] for duration_type in self.duration_types])
-            self.ax.bar(self.duration_starts, 1, self.duration_lengths, mdates.date2num(self.duration_dates), align="edge", **plot_kwargs)
-            self.plot_dates()
-            self.plot_times()
+            # All durations are drawn as a single collection of rectangles, rather than one artist per duration
+            lefts = self.duration_starts
+            rights = lefts + self.duration_lengths
+            bottoms = self.duration_dates.view("i8") + _epoch_date_num()
+            tops = bottoms + 1
+            verts = np.stack((
+                np.stack((lefts, rights, rights, lefts), axis=1),
+                np.stack((bottoms, bottoms, tops, tops), axis=1)
+            ), axis=2)
+            facecolors = None if self.duration_color_ids is None else self.palette[self.duration_color_ids]
+            if collection is None:
+                collection = PolyCollection(verts, **{"linewidths": 0, "facecolors": facecolors, **plot_kwargs})
+                self.ax.add_collection(collection)
+                self.ax.autoscale_view()
+                self.plot_dates()
+                self.plot_times()
+                return
+            collection.set_verts(verts)
+            if facecolors is not None and not {"color", "facecolor", "facecolors"} & plot_kwargs.keys():
+                collection.set_facecolors(facecolors)
 
         if plot_kwargs is None:
             plot_kwargs = {}
@@ -169,17 +433,44 @@ class HeartbeatData:
             refresh()
 
     def plot_duration_counts(self, as_heatmap=False, weekly=False, timeout_slider=True, plot_kwargs: dict[str, any] = None, slider_kwargs: dict[str, any] = None):
+        artist = None
+        y: np.ndarray = None
+
+        def downsample_heatmap():
+            # Averaged down to about twice the axes' width in pixels, so matplotlib
+            # doesn't have to resample the full-resolution array on every draw
+            factor = max(1, y.size // max(1, round(2 * self.ax.bbox.width)))
+            used = y.size // factor * factor
+            return y[:used].reshape(-1, factor).mean(axis=1)[newaxis, :], (-0.5, used - 0.5, 0.5, -0.5)
+
+        def refresh_heatmap(*_):
+            data, extent = downsample_heatmap()
+            artist.set_data(data)
+            artist.set_extent(extent)
+            if not {"norm", "vmin", "vmax"} & plot_kwargs.keys():
+                artist.autoscale()
+
         def refresh():
+            nonlocal artist, y
             if self.duration_counts is None:
                 raise ValueError("Tried to plot duration counts before duration counts have been calculated")
             y = self.duration_counts.flatten() if weekly else npsum(self.duration_counts, axis=0)
-            if as_heatmap:
-                self.ax.imshow(y[newaxis, :], aspect="auto", **plot_kwargs)
-                self.ax.set_yticks([])
+            if artist is None:
+                if as_heatmap:
+                    data, extent = downsample_heatmap()
+                    artist = self.ax.imshow(data, aspect="auto", extent=extent, **plot_kwargs)
+                    self.ax.set_yticks([])
+                    self.fig.canvas.mpl_connect("resize_event", refresh_heatmap)
+                else:
+                    self.ax.set_ylabel("How many durations include that time")
+                    artist, = self.ax.plot(y, **plot_kwargs)
+                self.plot_times(weekly)
+            elif as_heatmap:
+                refresh_heatmap()
             else:
-                self.ax.set_ylabel("How many durations include that time")
-                self.ax.plot(y, **plot_kwargs)
-            self.plot_times(weekly)
+                artist.set_ydata(y)
+                self.ax.relim()
+                self.ax.autoscale_view()
 
         if plot_kwargs is None:
             plot_kwargs = {}
@@ -190,18 +481,41 @@ class HeartbeatData:
         else:
             refresh()
 
-    def show_timeout_slider(self, calc_fn: Callable, plot_fn: Callable, default=DEFAULT_TIMEOUT, rect: tuple[float, float, float, float] = None):
+    def show_timeout_slider(self, calc_fn: Callable, plot_fn: Callable, default=DEFAULT_TIMEOUT, rect: tuple[float, float, float, float] = None, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        pending_timeout = None
+
         def refresh(timeout):
             calc_fn(timeout)
             print("Refreshing plot")
-            self.ax.clear()
-            plot_fn()
+            plot_fn()  # Updates the existing artists in place
             self.fig.canvas.draw_idle()
 
+        def refresh_pending(*_):
+            nonlocal pending_timeout
+            refresh_timer.stop()
+            if pending_timeout is not None:
+                timeout, pending_timeout = pending_timeout, None
+                refresh(timeout)
+
+        def on_changed(timeout):
+            nonlocal pending_timeout
+            if not self.timeout_slider.drag_active:
+                pending_timeout = timeout
+                refresh_pending()
+                return
+            # While dragging, only refresh once per refresh_interval using the latest timeout
+            if pending_timeout is None:
+                refresh_timer.start()
+            pending_timeout = timeout
+
         if rect is None:
             rect = [0.15, 0.1, 0.75, 0.03]
         calc_fn(default)
         plot_fn()
         self.fig.subplots_adjust(bottom=rect[1] * 2 + rect[3])
         self.timeout_slider = Slider(self.fig.add_axes(rect), 'Timeout', 1, _SECS_IN_DAY, valinit=default)
-        self.timeout_slider.on_changed(refresh)
+        refresh_timer = self.fig.canvas.new_timer(interval=refresh_interval)
+        refresh_timer.single_shot = True
+        refresh_timer.add_callback(refresh_pending)
+        self.fig.canvas.mpl_connect("button_release_event", refresh_pending)
+        self.timeout_slider.on_changed(on_changed)